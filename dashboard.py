@@ -1,47 +1,239 @@
 # app/admin/dashboard.py
 
 import pandas as pd
+from pandas.api.types import union_categoricals
+import polars as pl
 import streamlit as st
 import os
-import plotly.express as px
-import re
+import tempfile
 from datetime import datetime, date
-import json
-import helper.summarizer as summarizer
+from pathlib import Path
+import orjson
 import uuid
 
-# run summarizer (keeps existing behaviour)
-summarizer.main()
-LOG_FILE = "data/bot.log"
-SUMMARY_PATH = "data/summary_log.jsonl"
+DATA_DIR = Path("data")
+LOG_FILE = DATA_DIR / "bot.log"
+SUMMARY_PATH = DATA_DIR / "summary_log.jsonl"
+# input log read by helper.summarizer (its LOG_PATH), checked here without importing it
+SUMMARIZER_LOG = Path("bot.log")
+# Anchored to the whole "Intent: ..." field (already split on "|" and stripped)
+INTENT_PATTERN = r"^Intent:\s*(\S.*?)\s*$"
+# Low-cardinality log columns stored as pandas categoricals (cheap equality filters and counts)
+CATEGORY_COLUMNS = ["Source", "Intent", "Guest Type"]
+SUMMARY_PAGE_SIZE = 20
+# logging's default asctime, as written by logger.py
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S,%3f"
 
 st.set_page_config(page_title="ILLORA_RETREATS – Admin Console", layout="wide")
 st.title("🏨 Illora Retreats – Concierge AI Admin Dashboard")
 
 # --- Helpers ---
+def file_key(path):
+    """
+    (mtime, size) of a file; passed to cached loaders so they re-read only when it changes.
+    Only the newest key is ever hit again, so those loaders keep just a couple of entries.
+    """
+    stat = os.stat(path)
+    return stat.st_mtime, stat.st_size
+
+# menu, campaigns and do's & don'ts share this loader, hence one slot per file plus a spare
+@st.cache_data(show_spinner=False, max_entries=4)
+def _read_json(path, mtime, size):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _read_csv(path, mtime, size):
+    return pd.read_csv(path)
+
 def load_json(path, default):
     if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(default, f, indent=2)
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return default
+        save_json(path, default)
+    try:
+        return _read_json(path, *file_key(path))
+    except (orjson.JSONDecodeError, OSError):
+        return default
 
 def save_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # write compact JSON to a unique temp file in the same directory and swap it in, so
+    # concurrent saves from other sessions or a crash mid-write never leave a truncated file
+    path = Path(path)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        # new file: the permissions open() would have given it
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file as 0600; keep the target's permissions so other users can still read it
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 def ensure_csv(path, cols):
     if not os.path.exists(path):
         pd.DataFrame(columns=cols).to_csv(path, index=False)
-    return pd.read_csv(path)
+    return _read_csv(path, *file_key(path))
+
+def parse_logs(source) -> pd.DataFrame:
+    """Parse bot.log chat lines from a path or raw bytes into the analytics frame."""
+    # Columns follow logger.py: "asctime | name | levelname | source | session | input | response | Intent/Guest..."
+    cols = ["Timestamp", "Logger", "Level", "Source", "Session ID", "User Input", "Response", "Guest Type", "Extra"]
+    raw = pl.read_csv(
+        source,
+        separator="|",
+        has_header=False,
+        schema={c: pl.String for c in cols},
+        missing_columns="insert",
+        truncate_ragged_lines=True,
+        quote_char=None,
+        encoding="utf8-lossy",
+    )
+
+    # Only chat lines (8+ fields) carry a guest/intent column; system log lines are dropped here
+    df = (
+        raw.filter(pl.col("Guest Type").is_not_null())
+        .select(pl.col("Timestamp", "Source", "Session ID", "User Input", "Response", "Guest Type").str.strip_chars())
+        .with_columns(pl.col("Guest Type").str.extract(INTENT_PATTERN, 1).fill_null("Unknown").alias("Intent"))
+        .select("Timestamp", "Source", "Session ID", "User Input", "Response", "Intent", "Guest Type")
+        # dictionary-encoded in Arrow, so these arrive in pandas as categoricals, never as object strings
+        .with_columns(
+            pl.col(CATEGORY_COLUMNS).cast(pl.Categorical),
+            pl.col("Timestamp").str.to_datetime(LOG_TIME_FORMAT, strict=False),
+        )
+        # Date stays a datetime64 column in pandas rather than Python date objects
+        .with_columns(pl.col("Timestamp").dt.date().alias("Date"))
+        .to_pandas()
+    )
+    return df
+
+def read_log_lines(path, offset, size):
+    """Raw bytes of the complete lines in [offset, size); a half-written last line is left for later."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(size - offset)
+    return data[:data.rfind(b"\n") + 1]
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_logs(path, mtime, size):
+    """Parse the log up to `size` bytes; returns the frame and the number of bytes it covers."""
+    data = read_log_lines(path, 0, size)
+    return parse_logs(data), len(data)
+
+def tail_logs(path):
+    """
+    bot.log is append-only: keep the parsed frame and byte offset in session state
+    and only parse lines written since the previous rerun.
+    """
+    mtime, size = file_key(path)
+    offset = st.session_state.get("log_offset")
+    if offset is None or size < offset:
+        # first run in this session, or the log was truncated/rotated
+        st.session_state["log_df"], st.session_state["log_offset"] = load_logs(path, mtime, size)
+        # a rotated log can reach the same offset again, so drop tables built from the old one
+        st.session_state.pop("log_aggregates", None)
+        return st.session_state["log_df"]
+
+    if size > offset:
+        new = read_log_lines(path, offset, size)
+        if new:
+            old_df, new_df = st.session_state["log_df"], parse_logs(new)
+            if old_df.empty:
+                st.session_state["log_df"] = new_df
+            elif not new_df.empty:
+                # concat of categoricals with different categories falls back to object strings;
+                # union_categoricals merges the categories and only remaps the integer codes
+                merged = {c: union_categoricals([old_df[c], new_df[c]]) for c in CATEGORY_COLUMNS}
+                combined = pd.concat(
+                    [old_df.drop(columns=CATEGORY_COLUMNS), new_df.drop(columns=CATEGORY_COLUMNS)], ignore_index=True
+                )
+                st.session_state["log_df"] = combined.assign(**merged)[old_df.columns]
+            st.session_state["log_offset"] = offset + len(new)
+    return st.session_state["log_df"]
+
+def log_aggregates(df, filtered_df, filters):
+    """
+    Per-chart count tables for the Analytics tab. Kept in session state next to log_df
+    and reused while the parsed log offset and the filter values are unchanged.
+    """
+    key = (st.session_state["log_offset"], filters)
+    cached = st.session_state.get("log_aggregates")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    tables = {
+        "guest": df.groupby("Guest Type", observed=True).size().reset_index(name="Messages"),
+        "source": filtered_df.groupby("Source", observed=True).size().rename_axis("Channel").reset_index(name="Messages"),
+        "intent": filtered_df.groupby("Intent", observed=True).size().sort_values(ascending=False).reset_index(name="Count"),
+        "session": filtered_df.groupby("Session ID").size().sort_values(ascending=False).reset_index(name="Messages"),
+        "daily": filtered_df.groupby("Date").size().reset_index(name="Messages"),
+    }
+    st.session_state["log_aggregates"] = (key, tables)
+    return tables
+
+# Figures are built from the small aggregate tables and cached, so a rerun that
+# leaves a chart's counts unchanged reuses the figure instead of rebuilding it
+@st.cache_data(show_spinner=False, max_entries=16)
+def pie_fig(counts, names, values):
+    import plotly.express as px
+    return px.pie(counts, names=names, values=values)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def bar_fig(counts, x, y, color=None):
+    import plotly.express as px
+    return px.bar(counts, x=x, y=y, color=color)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def line_fig(counts, x, y):
+    import plotly.express as px
+    return px.line(counts, x=x, y=y, markers=True)
+
+# ttl: main() skips sessions whose Groq call failed, so retry them periodically even if the log is unchanged
+@st.cache_resource(show_spinner=False, ttl=600, max_entries=1)
+def _summarize_sessions(mtime, size):
+    import helper.summarizer as summarizer
+    summarizer.main()
+
+def run_summarizer():
+    """
+    Summarize new chat sessions when the summarizer's log has changed, and again every ten
+    minutes so sessions whose summary failed are retried.
+    helper.summarizer (and its Groq client) is imported only on a cache miss.
+    """
+    if os.path.exists(SUMMARIZER_LOG):
+        _summarize_sessions(*file_key(SUMMARIZER_LOG))
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_summaries(path, mtime, size) -> pd.DataFrame:
+    # parsed line by line (not pd.read_json(lines=True)) so one malformed line doesn't drop the rest
+    summaries = []
+    with open(path, "rb") as f:
+        for line in f.read().splitlines():
+            try:
+                summaries.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                continue
+    return pd.DataFrame.from_records(summaries, columns=["session_id", "summary", "follow_up_email"])
 
 # --- Data Sources ---
-QA_CSV = "data/qa_pairs.csv"
-MENU_FILE = "services/menu.json"
-CAMPAIGNS_FILE = "data/campaigns.json"
+QA_CSV = DATA_DIR / "qa_pairs.csv"
+MENU_FILE = Path("services") / "menu.json"
+CAMPAIGNS_FILE = DATA_DIR / "campaigns.json"
+DOSDONTS_FILE = DATA_DIR / "dos_donts.json"
+CAMPAIGN_COLUMNS = [
+    "id", "name", "description", "discount_type", "discount_value",
+    "start_date", "end_date", "active", "created_at",
+]
+
+# run summarizer (keeps existing behaviour)
+run_summarizer()
 
 # --- Tabs ---
 tabs = st.tabs(["📊 Analytics", "💬 Q&A Manager", "🏷️ Menu Manager", "📢 Campaigns Manager", "✅ Do's & ❌ Don'ts Manager"])
@@ -54,28 +246,7 @@ with tabs[0]:
         st.warning("No logs found yet.")
         st.stop()
 
-    # --- Parse logs ---
-    log_lines = []
-    with open(LOG_FILE, "r", encoding="ISO-8859-1") as f:
-        for line in f:
-            parts = [part.strip() for part in line.strip().split("|")]
-            if len(parts) >= 8:
-                timestamp = parts[0]
-                source = parts[3]
-                session_id = parts[4]
-                user_input = parts[5]
-                response = parts[6]
-                guest_type = parts[7]
-                intent_match = re.search(r"Intent: (.+)", line)
-                intent = intent_match.group(1) if intent_match else "Unknown"
-                log_lines.append([timestamp, source, session_id, user_input, response, intent, guest_type])
-
-    df = pd.DataFrame(
-        log_lines,
-        columns=["Timestamp", "Source", "Session ID", "User Input", "Response", "Intent", "Guest Type"],
-    )
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
-    df["Date"] = df["Timestamp"].dt.date
+    df = tail_logs(LOG_FILE)
 
     # --- Sidebar filters ---
     st.sidebar.header("🔍 Filter Analytics")
@@ -83,47 +254,43 @@ with tabs[0]:
     intent_filter = st.sidebar.selectbox("🎯 Intent", ["All"] + sorted(df["Intent"].unique().tolist()))
     guest_filter = st.sidebar.selectbox("🏷️ Guest Type", ["All", "Guest", "Non-Guest"])
 
-    filtered_df = df.copy()
+    # combine the filters into one mask and index the frame once
+    mask = pd.Series(True, index=df.index)
     if source_filter != "All":
-        filtered_df = filtered_df[filtered_df["Source"] == source_filter]
+        mask &= df["Source"].eq(source_filter)
     if intent_filter != "All":
-        filtered_df = filtered_df[filtered_df["Intent"] == intent_filter]
+        mask &= df["Intent"].eq(intent_filter)
     if guest_filter != "All":
-        filtered_df = filtered_df[filtered_df["Guest Type"].str.lower() == guest_filter.lower()]
+        guest_types = df["Guest Type"].cat.categories
+        mask &= df["Guest Type"].isin(guest_types[guest_types.str.lower() == guest_filter.lower()])
+    filtered_df = df[mask]
+
+    aggregates = log_aggregates(df, filtered_df, (source_filter, intent_filter, guest_filter))
 
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("🗨️ Total Interactions", len(filtered_df))
-    col2.metric("👥 Unique Sessions", filtered_df["Session ID"].nunique())
-    col3.metric("🔍 Unique Intents", filtered_df["Intent"].nunique())
+    col2.metric("👥 Unique Sessions", len(aggregates["session"]))
+    col3.metric("🔍 Unique Intents", len(aggregates["intent"]))
     col4.metric("🏷️ Guest Type", guest_filter if guest_filter != "All" else "All Types")
 
     st.markdown("---")
 
     # Graphs
     st.subheader("Guest vs Non-Guest Breakdown")
-    guest_counts = df["Guest Type"].value_counts().reset_index()
-    guest_counts.columns = ["Guest Type", "Messages"]
-    st.plotly_chart(px.pie(guest_counts, names="Guest Type", values="Messages"), use_container_width=True)
+    st.plotly_chart(pie_fig(aggregates["guest"], "Guest Type", "Messages"), use_container_width=True)
 
     st.subheader("Channel Distribution")
-    source_counts = filtered_df["Source"].value_counts().reset_index()
-    source_counts.columns = ["Channel", "Messages"]
-    st.plotly_chart(px.pie(source_counts, names="Channel", values="Messages"), use_container_width=True)
+    st.plotly_chart(pie_fig(aggregates["source"], "Channel", "Messages"), use_container_width=True)
 
     st.subheader("Daily Interaction Volume")
-    daily = filtered_df.groupby("Date").size().reset_index(name="Messages")
-    st.plotly_chart(px.line(daily, x="Date", y="Messages", markers=True), use_container_width=True)
+    st.plotly_chart(line_fig(aggregates["daily"], "Date", "Messages"), use_container_width=True)
 
     st.subheader("Guest Needs Breakdown")
-    intent_counts = filtered_df["Intent"].value_counts().reset_index()
-    intent_counts.columns = ["Intent", "Count"]
-    st.plotly_chart(px.bar(intent_counts, x="Intent", y="Count", color="Intent"), use_container_width=True)
+    st.plotly_chart(bar_fig(aggregates["intent"], "Intent", "Count", color="Intent"), use_container_width=True)
 
     st.subheader("Engagement by Session")
-    session_counts = filtered_df["Session ID"].value_counts().reset_index()
-    session_counts.columns = ["Session ID", "Messages"]
-    st.plotly_chart(px.bar(session_counts, x="Session ID", y="Messages"), use_container_width=True)
+    st.plotly_chart(bar_fig(aggregates["session"], "Session ID", "Messages"), use_container_width=True)
 
     st.subheader("📜 Guest Interaction Log")
     st.dataframe(filtered_df)
@@ -132,34 +299,32 @@ with tabs[0]:
 
     st.subheader("🧠 Guest Session Summaries")
     if os.path.exists(SUMMARY_PATH):
-        summaries = []
-        with open(SUMMARY_PATH, "r", encoding="ISO-8859-1") as f:
-            for line in f:
-                try:
-                    summaries.append(json.loads(line.strip()))
-                except:
-                    continue
-        if summaries:
-            summary_df = pd.DataFrame(summaries)
-            for _, row in summary_df.iterrows():
-                with st.expander(f"Session: {row['session_id']}"):
-                    st.write("📝", row["summary"])
-                    st.write("📧", row["follow_up_email"])
+        summary_df = load_summaries(SUMMARY_PATH, *file_key(SUMMARY_PATH))
+        if not summary_df.empty:
+            # expanders only for the most recent sessions; the full set goes in one virtualized table
+            recent = summary_df.tail(SUMMARY_PAGE_SIZE).iloc[::-1]
+            for row in recent.itertuples(index=False):
+                with st.expander(f"Session: {row.session_id}"):
+                    st.write("📝", row.summary)
+                    st.write("📧", row.follow_up_email)
+            if len(summary_df) > SUMMARY_PAGE_SIZE:
+                st.caption(f"Showing the latest {SUMMARY_PAGE_SIZE} of {len(summary_df)} sessions.")
+                st.dataframe(summary_df, use_container_width=True)
 
 # ======================================================
 # 💬 Q&A MANAGER TAB
 # ======================================================
 with tabs[1]:
     st.header("💬 Q&A Manager")
-    qa_df = ensure_csv('data\\qa_pairs.csv', ["question", "answer"])
+    qa_df = ensure_csv(QA_CSV, ["question", "answer"])
     st.dataframe(qa_df, use_container_width=True)
 
     with st.form("addqa", clear_on_submit=True):
         q = st.text_input("Question")
         a = st.text_area("Answer")
         if st.form_submit_button("➕ Add Q&A"):
-            qa_df = qa_df.append({"question": q, "answer": a}, ignore_index=True)
-            qa_df.to_csv(QA_CSV, index=False)
+            # append the row instead of rewriting the whole CSV
+            pd.DataFrame([[q, a]], columns=["question", "answer"]).to_csv(QA_CSV, mode="a", header=False, index=False)
             st.success("Q&A added!")
 
 # ======================================================
@@ -173,7 +338,7 @@ with tabs[2]:
     for cat, items in menu.items():
         with st.expander(f"{cat.title()}"):
             if isinstance(items, dict):
-                df_items = pd.DataFrame([{"key": k, "price": v} for k, v in items.items()])
+                df_items = pd.DataFrame({"key": list(items), "price": list(items.values())})
                 st.dataframe(df_items)
             elif isinstance(items, list):
                 st.dataframe(pd.DataFrame(items))
@@ -188,7 +353,7 @@ with tabs[3]:
     campaigns = load_json(CAMPAIGNS_FILE, [])
 
     if campaigns:
-        st.dataframe(pd.DataFrame(campaigns), use_container_width=True)
+        st.dataframe(pd.DataFrame.from_records(campaigns, columns=CAMPAIGN_COLUMNS), use_container_width=True)
     else:
         st.info("No campaigns yet.")
 
@@ -226,12 +391,11 @@ with tabs[3]:
 with tabs[4]:
     st.header("✅ Do's & ❌ Don'ts Manager")
 
-    DOSDONTS_FILE = 'data\\dos_donts.json'    
     # Load existing instructions
     dos_donts = load_json(DOSDONTS_FILE, [])
 
     if dos_donts:
-        st.dataframe(pd.DataFrame(dos_donts), use_container_width=True)
+        st.dataframe(pd.DataFrame.from_records(dos_donts, columns=["do", "dont"]), use_container_width=True)
     else:
         st.info("No instructions added yet.")
 
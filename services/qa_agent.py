@@ -1,5 +1,7 @@
 # qa_agent.py
 
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 from azure.ai.inference import ChatCompletionsClient
 from azure.ai.inference.models import SystemMessage, UserMessage
@@ -8,12 +10,29 @@ from langchain_openai import ChatOpenAI
 from vector_store import create_vector_store
 from config import Config
 from logger import setup_logger
-import os, json
+import os, json, re
 
 logger = setup_logger("QAAgent")
 
 
 class ConciergeBot:
+    # Services limited to in-house guests, matched in one pass over the query
+    RESTRICTED_SERVICES = re.compile(
+        "|".join(map(re.escape, [
+            "wake-up call", "spa", "gym", "pool", "room service", "book a room", "booking"
+        ])),
+        re.IGNORECASE,
+    )
+
+    # Static branding/instructions that open every prompt
+    PROMPT_HEAD = (
+        "You are a knowledgeable, polite, and concise concierge assistant at *ILLORA RETREATS*, "
+        "a premium hotel known for elegant accommodations, gourmet dining, rejuvenating spa treatments, "
+        "a fully-equipped gym, pool access, 24x7 room service, meeting spaces, and personalized hospitality.\n\n"
+        "Answer strictly using the Hotel Data below. If the data does not contain the answer, say: "
+        "'I don’t have that information in the hotel data yet.'\n\n"
+    )
+
     def __init__(self):
         try:
             # Build / fetch FAISS vector store (cached in-process)
@@ -25,6 +44,9 @@ class ConciergeBot:
             self.retriever = self.vector_store.as_retriever(
                 search_type="mmr", search_kwargs={"k": k, "fetch_k": fetch_k}
             )
+            # Repeated questions skip the embedding + FAISS search (keyed on the normalized query)
+            cache_size = getattr(Config, "RETRIEVER_CACHE_SIZE", 512)
+            self._retrieve = lru_cache(maxsize=cache_size)(self.retriever.invoke)
 
             # Initialize GitHub Inference via Azure AI Inference SDK
             self.llm = ChatOpenAI(
@@ -35,8 +57,11 @@ class ConciergeBot:
             )
 
             # Load Do’s & Don’ts
-            self.dos_donts_path = "data/dos_donts.json"
-            self.dos_donts = self._load_dos_donts()
+            self.dos_donts_path = Path("data") / "dos_donts.json"
+            self._dos_donts_mtime = None
+            self.dos_donts = []
+            self._rules_text = ""
+            self._refresh_dos_donts()
 
             logger.info("ILLORA RETREATS QA agent initialized successfully.")
 
@@ -55,48 +80,56 @@ class ConciergeBot:
             logger.warning(f"Failed to load Do's & Don'ts file: {e}")
             return []
 
+    def _refresh_dos_donts(self):
+        """Reload Do's & Don'ts only when the file's mtime has changed."""
+        try:
+            mtime = os.path.getmtime(self.dos_donts_path)
+        except OSError:
+            mtime = None
+        if mtime != self._dos_donts_mtime:
+            self._dos_donts_mtime = mtime
+            self.dos_donts = self._load_dos_donts()
+            self._rules_text = self._format_rules()
+
+    def _format_rules(self) -> str:
+        """Render Do's & Don'ts as the rules block appended to every prompt."""
+        if not self.dos_donts:
+            return ""
+        lines = []
+        for entry in self.dos_donts:
+            do = entry.get("do", "").strip()
+            dont = entry.get("dont", "").strip()
+            if do:
+                lines.append(f"- ✅ Do: {do}")
+            if dont:
+                lines.append(f"- ❌ Don't: {dont}")
+        return "\n\n📋 **Important Communication Rules:**\n" + "".join(f"{line}\n" for line in lines)
+
     def _build_prompt(self, hotel_data: str, query: str) -> str:
         """
         Construct the system prompt that combines branding + hotel data + rules.
         """
-        rules_text = ""
-        if self.dos_donts:
-            rules_text = "\n\n📋 **Important Communication Rules:**\n"
-            for idx, entry in enumerate(self.dos_donts, start=1):
-                do = entry.get("do", "").strip()
-                dont = entry.get("dont", "").strip()
-                if do:
-                    rules_text += f"- ✅ Do: {do}\n"
-                if dont:
-                    rules_text += f"- ❌ Don't: {dont}\n"
-
         return (
-            "You are a knowledgeable, polite, and concise concierge assistant at *ILLORA RETREATS*, "
-            "a premium hotel known for elegant accommodations, gourmet dining, rejuvenating spa treatments, "
-            "a fully-equipped gym, pool access, 24x7 room service, meeting spaces, and personalized hospitality.\n\n"
-            "Answer strictly using the Hotel Data below. If the data does not contain the answer, say: "
-            "'I don’t have that information in the hotel data yet.'\n\n"
+            f"{self.PROMPT_HEAD}"
             f"Hotel Data:\n{hotel_data}\n\n"
             f"Guest Query: {query}\n"
-            f"{rules_text}"
+            f"{self._rules_text}"
         )
 
     def ask(self, query: str, user_type: Optional[str] = None) -> str:
         try:
-            restricted_services = [
-                "wake-up call", "spa", "gym", "pool", "room service", "book a room", "booking"
-            ]
-            lower_query = (query or "").lower()
-
             # Block restricted queries for non-guests
-            if user_type == "non-guest" and any(term in lower_query for term in restricted_services):
+            if user_type == "non-guest" and self.RESTRICTED_SERVICES.search(query or ""):
                 return (
                     "We're sorry, this service is exclusive to *guests* at ILLORA RETREATS.\n"
                     "Feel free to explore our dining options, events, and lobby amenities!"
                 )
 
-            # 🔑 Correct: retrieve using raw query only
-            docs = self.retriever.invoke(query)
+            # Pick up Do's & Don'ts edited from the admin dashboard
+            self._refresh_dos_donts()
+
+            # 🔑 Correct: retrieve using the guest query only (case/whitespace-normalized for the cache)
+            docs = self._retrieve(" ".join((query or "").lower().split()))
             hotel_data = "\n\n".join(d.page_content for d in docs) if docs else ""
 
             # Build system prompt with rules
@@ -117,3 +150,9 @@ class ConciergeBot:
                 "We're sorry, there was an issue while assisting you. "
                 "Please feel free to ask again or contact the ILLORA RETREATS front desk for immediate help."
             )
+
+
+@lru_cache(maxsize=1)
+def get_bot() -> ConciergeBot:
+    """Process-wide ConciergeBot, so the vector store and LLM client are built once."""
+    return ConciergeBot()
@@ -2,7 +2,7 @@
 
 from flask import Flask, request
 from twilio.twiml.messaging_response import MessagingResponse
-from services.qa_agent import ConciergeBot
+from services.qa_agent import get_bot
 from services.payment_gateway import create_checkout_session, create_addon_checkout_session
 from logger import log_chat
 from services.intent_classifier import classify_intent
@@ -10,7 +10,7 @@ from services.intent_classifier import classify_intent
 import uuid
 
 app = Flask(__name__)
-bot = ConciergeBot()
+bot = get_bot()
 session_data = {}
 
 ROOM_PRICES = {
@@ -17,7 +17,7 @@ from logger import log_chat
 
 # existing project imports (kept; adjusted)
 from services.payment_gateway import create_checkout_session, create_addon_checkout_session, create_pending_checkout_session
-from services.qa_agent import ConciergeBot
+from services.qa_agent import get_bot
 from services.intent_classifier import classify_intent
 
 # SINGLE source-of-truth models & DB session
@@ -510,7 +510,7 @@ def clear_localstorage_token_and_reload():
 
 # --- Session state init -----------------------------------------------------
 if "bot" not in st.session_state:
-    st.session_state.bot = ConciergeBot()
+    st.session_state.bot = get_bot()
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "session_id" not in st.session_state: